@@ -1,12 +1,20 @@
+import functools
 import logging
 import os
+import queue
 import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 import numpy as np
+from numba import njit, prange, set_num_threads
 from dotenv import load_dotenv
 from pyht import Client
 from pyht.client import TTSOptions
 from gtts import gTTS
 from moviepy.editor import *
+from moviepy.config import get_setting
 from PIL import Image, ImageDraw, ImageFont
 
 # Configure comprehensive logging
@@ -31,21 +39,26 @@ class EventParser:
         'angry': r'\[angry\]',
         'confused': r'\[confused\]'
     }
+    # Semua pola digabung menjadi satu regex dengan named group per event
+    EVENT_REGEX = re.compile('|'.join(f'(?P<{event_type}>{pattern})' for event_type, pattern in EVENT_PATTERNS.items()))
 
     @classmethod
     def parse_events(cls, text):
         """Parse events from text, removing event markers"""
-        events = []
+        found = set()
         
-        for event_type, pattern in cls.EVENT_PATTERNS.items():
-            match = re.search(pattern, text)
-            if match:
-                events.append((0.5, event_type))
-                text = re.sub(pattern, '', text).strip()
+        def remove_marker(match):
+            found.add(match.lastgroup)
+            return ''
+        
+        text = cls.EVENT_REGEX.sub(remove_marker, text).strip()
+        events = [(0.5, event_type) for event_type in cls.EVENT_PATTERNS if event_type in found]
         
         return text, events
 
 class AudioGenerator:
+    FILE_BUFFER_SIZE = 1 << 20
+
     @staticmethod
     def generate_gtts(text, output_file, lang='id'):
         """Generate audio using Google Text-to-Speech"""
@@ -65,7 +78,9 @@ class AudioGenerator:
             client = Client(user_id=user_id, api_key=api_key)
 
             options = TTSOptions(voice=voice_url)
-            with open(output_file, "wb") as audio_file:
+            # Buffer file besar menampung chunk stream yang kecil-kecil,
+            # sehingga penulisan ke disk terjadi dalam blok besar
+            with open(output_file, "wb", buffering=AudioGenerator.FILE_BUFFER_SIZE) as audio_file:
                 for chunk in client.tts(text, options, voice_engine='PlayDialog', protocol='http'):
                     audio_file.write(chunk)
             
@@ -73,9 +88,45 @@ class AudioGenerator:
         except Exception as e:
             logger.error(f"Play.ht audio generation error: {e}")
 
+@functools.lru_cache(maxsize=32)
+def _load_font(path, size):
+    """Memuat font TTF sekali per (path, ukuran), fallback ke font default"""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError as e:
+        logger.warning(f"Font {path} could not be loaded, using default font: {e}")
+        return ImageFont.load_default()
+
 class SubtitleGenerator:
+    FONT_PATH = "/usr/share/fonts/TTF/DejaVuSans.ttf"
+
     @staticmethod
-    def create_subtitle_mask(w, h, text, fontsize=48):
+    def _dilate(alpha, radius):
+        """
+        Dilasi maksimum dengan kernel kotak (2 * radius + 1) secara separable:
+        max 1D horizontal lalu max 1D vertikal, masing-masing lewat operasi numpy
+        
+        Args:
+        - alpha (numpy.ndarray): Channel alpha uint8 [h, w]
+        - radius (int): Lebar dilasi ke tiap arah
+        
+        Returns:
+        - numpy.ndarray: Channel alpha hasil dilasi
+        """
+        horizontal = alpha.copy()
+        for shift in range(1, radius + 1):
+            np.maximum(horizontal[:, shift:], alpha[:, :-shift], out=horizontal[:, shift:])
+            np.maximum(horizontal[:, :-shift], alpha[:, shift:], out=horizontal[:, :-shift])
+        
+        dilated = horizontal.copy()
+        for shift in range(1, radius + 1):
+            np.maximum(dilated[shift:], horizontal[:-shift], out=dilated[shift:])
+            np.maximum(dilated[:-shift], horizontal[shift:], out=dilated[:-shift])
+        
+        return dilated
+
+    @classmethod
+    def create_subtitle_mask(cls, w, h, text, fontsize=48):
         """
         Membuat mask subtitle dengan penanganan teks panjang
         
@@ -86,30 +137,34 @@ class SubtitleGenerator:
         - fontsize (int): Ukuran font
         
         Returns:
-        - numpy.ndarray: Mask subtitle
+        - tuple: Warna subtitle (numpy.ndarray uint8 [h, w, 3]) dan
+          mask piksel subtitle (numpy.ndarray bool [h, w])
         """
         mask = Image.new('RGBA', (w, h), (0, 0, 0, 0))
         draw = ImageDraw.Draw(mask)
         
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/TTF/DejaVuSans.ttf", fontsize)
-        except:
-            font = ImageFont.load_default()
+        font = _load_font(cls.FONT_PATH, fontsize)
+        words = text.split()
         
-        def wrap_text(text, font, max_width):
-            words = text.split()
+        def wrap_text(font, max_width):
+            # Lebar tiap kata diukur sekali, lalu baris disusun secara greedy
+            # dari akumulasi lebar tanpa mengukur ulang seluruh baris
+            word_widths = [font.getlength(word) for word in words]
+            space_width = font.getlength(' ')
             lines = []
             current_line = []
+            current_width = 0
             
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                bbox = draw.textbbox((0, 0), test_line, font=font)
+            for word, word_width in zip(words, word_widths):
+                test_width = current_width + space_width + word_width if current_line else word_width
                 
-                if bbox[2] - bbox[0] <= max_width:
+                if test_width <= max_width or not current_line:
                     current_line.append(word)
+                    current_width = test_width
                 else:
                     lines.append(' '.join(current_line))
                     current_line = [word]
+                    current_width = word_width
             
             if current_line:
                 lines.append(' '.join(current_line))
@@ -121,8 +176,8 @@ class SubtitleGenerator:
         wrapped_lines = []
         
         while current_fontsize > 20:
-            font = ImageFont.truetype("/usr/share/fonts/TTF/DejaVuSans.ttf", current_fontsize)
-            wrapped_lines = wrap_text(text, font, max_subtitle_width)
+            font = _load_font(cls.FONT_PATH, current_fontsize)
+            wrapped_lines = wrap_text(font, max_subtitle_width)
             
             if len(wrapped_lines) <= 3:
                 break
@@ -137,17 +192,35 @@ class SubtitleGenerator:
         x = (w - text_width) // 2
         y = (h - text_height) // 2
         
-        outline_color = (0, 0, 0, 255)
-        outline_width = 2
-        for offset_x in range(-outline_width, outline_width + 1):
-            for offset_y in range(-outline_width, outline_width + 1):
-                draw.multiline_text((x + offset_x, y + offset_y), wrapped_text, 
-                                    font=font, fill=outline_color, align='center')
-        
         draw.multiline_text((x, y), wrapped_text, 
                             font=font, fill=(255, 255, 255, 255), align='center')
         
-        return np.array(mask)
+        # Outline dibuat dari dilasi alpha teks, bukan menggambar ulang teks di tiap offset
+        outline_width = 2
+        outline_alpha = cls._dilate(np.array(mask.getchannel('A')), outline_width)
+        outline = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+        outline.putalpha(Image.fromarray(outline_alpha))
+        
+        subtitle = Image.alpha_composite(outline, mask)
+        subtitle_rgb = np.array(subtitle.convert('RGB'))
+        subtitle_alpha = np.array(subtitle.getchannel('A')) > 0
+        
+        return subtitle_rgb, subtitle_alpha
+
+@functools.lru_cache(maxsize=2)
+def _cached_subtitle_mask(w, h, text, fontsize=48):
+    """
+    Versi cache dari SubtitleGenerator.create_subtitle_mask untuk teks yang berulang.
+    Array dikunci read-only karena dipakai bersama oleh beberapa klip.
+    
+    Cache ini ada di tiap worker proses render dan tiap entri berukuran satu
+    frame penuh (~8 MB), jadi sengaja dibuat kecil: hanya menangkap teks
+    berulang yang kebetulan dirender berurutan di worker yang sama.
+    """
+    subtitle_rgb, subtitle_alpha = SubtitleGenerator.create_subtitle_mask(w, h, text, fontsize)
+    subtitle_rgb.setflags(write=False)
+    subtitle_alpha.setflags(write=False)
+    return subtitle_rgb, subtitle_alpha
 
 class ImageProcessor:
     @staticmethod
@@ -167,7 +240,7 @@ class ImageProcessor:
                 width, height = img.size
                 aspect_ratio = width / height
                 new_width = int(target_height * aspect_ratio)
-                return img.resize((new_width, target_height), Image.Resampling.LANCZOS)
+                return img.convert('RGBA').resize((new_width, target_height), Image.Resampling.LANCZOS)
         except Exception as e:
             logging.error(f"Error scaling image: {e}")
             return None
@@ -182,7 +255,12 @@ class DialogClip:
         'confused': {'shake_amount': 10, 'frequency': 15}
     }
 
-    def __init__(self, background, char1, char2, text, speaking_char, duration, events=None):
+    def __init__(self, background, char1, char2, text, speaking_char, duration, events=None, fps=30):
+        """
+        Args:
+        - background (PIL.Image): Background 1920x1080
+        - char1, char2 (tuple): Pasangan (rgb, alpha) numpy array tiap karakter
+        """
         self.background = background
         self.char1 = char1
         self.char2 = char2
@@ -190,47 +268,113 @@ class DialogClip:
         self.speaking_char = speaking_char
         self.duration = duration
         self.events = events or []
+        self.fps = fps
         self.frame_width = 1920
         self.frame_height = 1080
         
-        logger.info(f"DialogClip created: Speaking Char {speaking_char}, Events: {self.events}")
-        
-    def __call__(self, t):
-        frame = self.background.copy()
-        
         char_height = 600
         margin = 10
-        char1_width = self.char1.size[0]
-        char2_width = self.char2.size[0]
+        self.char1_x = margin
+        self.char2_x = self.frame_width - char2[0].shape[1] - margin
+        self.char_y = self.frame_height - char_height
+        
+        # Karakter yang diam posisinya tetap, jadi langsung digabung ke background
+        # sekali saja; tiap frame cukup menempelkan karakter yang sedang bicara
+        self._static_frame = np.array(background.convert('RGB'))
+        if speaking_char == 1:
+            moving_char, self._moving_x = char1, self.char1_x
+            static_char, static_x = char2, self.char2_x
+        else:
+            moving_char, self._moving_x = char2, self.char2_x
+            static_char, static_x = char1, self.char1_x
+        
+        static_premul, static_inv_alpha = self._premultiply(*static_char)
+        h, w = static_inv_alpha.shape
+        region = self._static_frame[self.char_y:self.char_y + h, static_x:static_x + w]
+        region[:] = (static_premul + region * static_inv_alpha[:, :, None] + 127) // 255
+        
+        # Karakter yang bergerak disimpan sebagai array premultiplied agar
+        # blending per frame cukup dengan operasi integer
+        self._moving_premul, self._moving_inv_alpha = self._premultiply(*moving_char)
+        
+        # Teks subtitle konstan sepanjang klip, jadi langsung ditanam ke frame statis.
+        # Mask tetap disimpan untuk menimpa ulang area yang tertutup karakter bergerak
+        self._subtitle_rgb, self._alpha_mask = _cached_subtitle_mask(
+            self.frame_width, self.frame_height, text
+        )
+        self._static_frame[self._alpha_mask] = self._subtitle_rgb[self._alpha_mask]
         
-        char1_x = margin
-        char2_x = self.frame_width - char2_width - margin
+        # Offset goyangan untuk setiap frame dihitung sekaligus di awal
+        self._offsets = self._compute_offsets()
         
-        char_y = self.frame_height - char_height
+        # Satu buffer frame dipakai ulang di setiap panggilan, tanpa alokasi per frame
+        self._frame_buffer = np.empty_like(self._static_frame)
         
-        shake_amount = 5
-        offset = int(shake_amount * np.sin(t * 10))
+        logger.info(f"DialogClip created: Speaking Char {speaking_char}, Events: {self.events}")
+        
+    @staticmethod
+    def _premultiply(rgb, alpha):
+        """Mengubah pasangan (rgb, alpha) karakter menjadi rgb premultiplied dan alpha terbalik"""
+        alpha = alpha.astype(np.uint16)
+        return rgb * alpha[:, :, None], 255 - alpha
+        
+    def _compute_offsets(self):
+        """Menghitung tabel offset goyangan karakter untuk tiap frame"""
+        times = np.arange(int(np.ceil(self.duration * self.fps)) + 1) / self.fps
+        offsets = 5 * np.sin(times * 10)
         
         for event_time, event_type in self.events:
-            if t >= event_time and t < event_time + 0.5:
-                event_params = self.EVENT_MOVEMENTS.get(event_type, {})
-                shake_amount = event_params.get('shake_amount', 5)
-                frequency = event_params.get('frequency', 10)
-                offset = int(shake_amount * np.sin(t * frequency))
-                logger.info(f"Event triggered: {event_type} at time {t}")
-        
-        if self.speaking_char == 1:
-            frame.paste(self.char1, (char1_x + offset, char_y), self.char1)
-            frame.paste(self.char2, (char2_x, char_y), self.char2)
-        else:
-            frame.paste(self.char1, (char1_x, char_y), self.char1)
-            frame.paste(self.char2, (char2_x + offset, char_y), self.char2)
+            event_params = self.EVENT_MOVEMENTS.get(event_type, {})
+            shake_amount = event_params.get('shake_amount', 5)
+            frequency = event_params.get('frequency', 10)
+            active = (times >= event_time) & (times < event_time + 0.5)
+            offsets[active] = shake_amount * np.sin(times[active] * frequency)
         
-        subtitle = SubtitleGenerator.create_subtitle_mask(self.frame_width, self.frame_height, self.text)
+        return offsets.astype(int)
         
-        frame_array = np.array(frame)
-        alpha_mask = subtitle[:, :, 3] > 0
-        frame_array[alpha_mask] = subtitle[alpha_mask][:, :3]
+    @staticmethod
+    @njit(parallel=True, cache=True)
+    def _blit(frame, src_premul, src_inv_alpha, x, y, overlay_rgb, overlay_mask):
+        """
+        Alpha blend gambar premultiplied ke frame pada posisi (x, y), terpotong di tepi frame.
+        Piksel overlay (subtitle) pada area yang sama ditulis ulang agar tetap di atas.
+        """
+        h, w = src_inv_alpha.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        
+        for fy in prange(y0, y1):
+            sy = fy - y
+            for fx in range(x0, x1):
+                sx = fx - x
+                if overlay_mask[fy, fx]:
+                    for c in range(3):
+                        frame[fy, fx, c] = overlay_rgb[fy, fx, c]
+                else:
+                    inv_alpha = src_inv_alpha[sy, sx]
+                    for c in range(3):
+                        frame[fy, fx, c] = (src_premul[sy, sx, c] + frame[fy, fx, c] * inv_alpha + 127) // 255
+        
+    def __call__(self, t):
+        """
+        Render frame pada waktu t.
+        Array yang dikembalikan dipakai ulang, jadi harus dipakai/disalin sebelum frame berikutnya.
+        """
+        frame_array = self._frame_buffer
+        np.copyto(frame_array, self._static_frame)
+        
+        frame_index = min(int(round(t * self.fps)), len(self._offsets) - 1)
+        offset = int(self._offsets[frame_index])
+        
+        self._blit(
+            frame_array, 
+            self._moving_premul, 
+            self._moving_inv_alpha, 
+            self._moving_x + offset, 
+            self.char_y, 
+            self._subtitle_rgb, 
+            self._alpha_mask
+        )
         
         return frame_array
 class Character:
@@ -241,10 +385,15 @@ class Character:
         self.voice_url = voice_url
         self.gender = gender
         self.scaled_image = None
+        self.scaled_rgb = None
+        self.scaled_alpha = None
 
     def scale_image(self, target_height=600):  # Updated to match ImageProcessor
-        """Scale gambar karakter"""
+        """Scale gambar karakter, sekaligus memisahkan warna dan alpha sebagai numpy array"""
         self.scaled_image = ImageProcessor.scale_image(self.image_path, target_height)
+        if self.scaled_image is not None:
+            self.scaled_rgb = np.array(self.scaled_image.convert('RGB'))
+            self.scaled_alpha = np.array(self.scaled_image.getchannel('A'))
         return self.scaled_image
 
     def generate_audio(self, text, output_file, lang='en'):
@@ -256,6 +405,188 @@ class Character:
         
         logger.info(f"Audio generated for {self.name} ({self.gender})")
 class VideoCreator:
+    TTS_WORKERS = 8
+    QUEUE_SIZE = 4
+    
+    # Semua segmen harus di-encode dengan parameter yang sama agar
+    # bisa digabung dengan concat demuxer tanpa encode ulang
+    FPS = 30
+    VIDEO_CODEC = 'libx264'
+    AUDIO_CODEC = 'aac'
+    SEGMENT_PRESET = 'ultrafast'
+    
+    # Encoder hardware yang dicoba sesuai prioritas, beserta preset (None jika
+    # encoder tidak punya opsi preset) dan parameter ffmpeg-nya
+    HW_VIDEO_ENCODERS = {
+        'h264_nvenc': ('p4', ['-b:v', '5M', '-pix_fmt', 'yuv420p']),
+        'h264_videotoolbox': (None, ['-b:v', '5M', '-pix_fmt', 'yuv420p']),
+        'h264_qsv': ('veryfast', ['-b:v', '5M', '-pix_fmt', 'nv12']),
+    }
+    _video_encoder = None
+    
+    # None berarti jumlah worker render mengikuti jumlah CPU. Encoder hardware
+    # dibatasi karena driver GPU membatasi jumlah sesi encode bersamaan
+    RENDER_WORKERS = None
+    HW_RENDER_WORKERS = 4
+    _render_assets = None
+
+    @staticmethod
+    def _generate_dialog_audio(text, output_file, lang, character):
+        """Menghasilkan audio satu dialog sesuai bahasanya"""
+        if lang == 'en':
+            AudioGenerator.generate_playht(text, output_file, character.voice_url)
+        else:  # 'id'
+            AudioGenerator.generate_gtts(text, output_file, lang='id')
+
+    @classmethod
+    def _detect_video_encoder(cls):
+        """
+        Mencari encoder H.264 hardware yang benar-benar bisa dipakai
+        
+        Returns:
+        - tuple: Nama codec, preset, dan parameter ffmpeg tambahan
+        """
+        if cls._video_encoder is not None:
+            return cls._video_encoder
+        
+        ffmpeg = get_setting("FFMPEG_BINARY")
+        cls._video_encoder = (cls.VIDEO_CODEC, cls.SEGMENT_PRESET, ['-pix_fmt', 'yuv420p'])
+        try:
+            encoders = subprocess.run(
+                [ffmpeg, '-hide_banner', '-encoders'], capture_output=True, text=True
+            ).stdout
+        except OSError as e:
+            logger.error(f"Failed to list ffmpeg encoders: {e}")
+            return cls._video_encoder
+        
+        for codec, (preset, params) in cls.HW_VIDEO_ENCODERS.items():
+            if codec not in encoders:
+                continue
+            
+            # Encoder bisa terdaftar walau hardware-nya tidak ada, jadi dicoba encode 1 frame
+            probe = subprocess.run(
+                [ffmpeg, '-hide_banner', '-f', 'lavfi', '-i', 'color=size=256x256:rate=1',
+                 '-frames:v', '1', '-c:v', codec] + cls._preset_args(preset) + params + ['-f', 'null', '-'],
+                capture_output=True
+            )
+            if probe.returncode == 0:
+                cls._video_encoder = (codec, preset, params)
+                break
+        
+        logger.info(f"Using video encoder: {cls._video_encoder[0]}")
+        return cls._video_encoder
+
+    @staticmethod
+    def _preset_args(preset):
+        """Argumen -preset ffmpeg, kosong jika encoder tidak memakai preset"""
+        return ['-preset', preset] if preset else []
+
+    @classmethod
+    def _write_segment(cls, dialog, audio_file, segment_file):
+        """
+        Menulis frame DialogClip langsung ke ffmpeg lewat pipe rawvideo,
+        sekaligus mux audio dialog ke segmen yang sama
+        """
+        codec, preset, ffmpeg_params = cls._detect_video_encoder()
+        frame_count = int(np.ceil(dialog.duration * cls.FPS))
+        command = [
+            get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f'{dialog.frame_width}x{dialog.frame_height}', '-r', str(cls.FPS), '-i', '-',
+            '-i', audio_file,
+            '-map', '0:v', '-map', '1:a',
+            '-c:v', codec
+        ] + cls._preset_args(preset) + ffmpeg_params + [
+            # Audio dipanjangkan dengan hening sampai video selesai agar
+            # tiap segmen sinkron saat digabung dengan concat demuxer
+            '-c:a', cls.AUDIO_CODEC, '-af', 'apad', '-t', f'{frame_count / cls.FPS:.3f}',
+            segment_file
+        ]
+        
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            for frame_index in range(frame_count):
+                process.stdin.write(dialog(frame_index / cls.FPS))
+        finally:
+            process.stdin.close()
+            process.wait()
+        
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    @classmethod
+    def _plan_rendering(cls):
+        """
+        Menentukan jumlah worker render sesuai encoder yang dipakai
+        
+        Returns:
+        - tuple: Jumlah worker dan encoder (codec, preset, parameter ffmpeg) untuk tiap worker
+        """
+        codec, preset, ffmpeg_params = cls._detect_video_encoder()
+        cpu_count = os.cpu_count() or 1
+        workers = cls.RENDER_WORKERS or cpu_count
+        
+        if codec in cls.HW_VIDEO_ENCODERS:
+            workers = min(workers, cls.HW_RENDER_WORKERS)
+        else:
+            # Thread x264 dibagi rata agar worker tidak berebut CPU
+            ffmpeg_params = ffmpeg_params + ['-threads', str(max(1, cpu_count // workers))]
+        
+        logger.info(f"Rendering with {workers} workers using {codec}")
+        return workers, (codec, preset, ffmpeg_params)
+
+    @classmethod
+    def _init_render_worker(cls, background, char1, char2, video_encoder):
+        """Menyimpan aset bersama di tiap worker proses render"""
+        # Paralelisme sudah di level proses, jadi kernel numba cukup satu thread
+        set_num_threads(1)
+        cls._video_encoder = video_encoder
+        cls._render_assets = (background, char1, char2)
+
+    @classmethod
+    def _render_segment(cls, index, text, audio_file, events, speaking_char):
+        """
+        Merender satu dialog menjadi segmen mp4 di worker proses
+        
+        Returns:
+        - str: Path segmen video
+        """
+        background, char1, char2 = cls._render_assets
+        audio_clip = AudioFileClip(audio_file)
+        duration = audio_clip.duration + 0.5
+        audio_clip.close()
+        
+        dialog = DialogClip(
+            background, 
+            char1, 
+            char2, 
+            text, 
+            speaking_char, 
+            duration, 
+            events=events,
+            fps=cls.FPS
+        )
+        segment_file = f"segment_{index:03d}.mp4"
+        cls._write_segment(dialog, audio_file, segment_file)
+        return segment_file
+
+    @staticmethod
+    def _concat_segments(segment_files, output_path):
+        """Menggabungkan segmen video dengan concat demuxer ffmpeg tanpa encode ulang"""
+        list_file = f"{output_path}.segments.txt"
+        with open(list_file, "w") as f:
+            for segment_file in segment_files:
+                f.write(f"file '{os.path.abspath(segment_file)}'\n")
+        
+        logger.info(f"Concatenating {len(segment_files)} segments into {output_path}")
+        try:
+            subprocess.run(
+                [get_setting("FFMPEG_BINARY"), '-y', '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', output_path],
+                check=True
+            )
+        finally:
+            os.remove(list_file)
+
     @classmethod
     def create_conversation_video_oop(cls, background_path, texts, languages, output_path="output.mp4"):
         logger.info("Starting video creation process")
@@ -287,51 +618,77 @@ class VideoCreator:
             all_events.append(text_events)
             logger.info(f"Processed Text: {cleaned_text}, Events: {text_events}")
 
-        # Audio generation with language-specific logic
+        # Audio generation with language-specific logic, dijalankan paralel
+        # karena tiap request TTS hanya menunggu jaringan
         audio_files = [f"dialog_{i}.mp3" for i in range(len(texts))]
-        for i, (text, output_file, lang, dialog_events) in enumerate(zip(processed_texts, audio_files, languages, all_events)):
+        audio_jobs = []
+        for i, (text, output_file, lang) in enumerate(zip(processed_texts, audio_files, languages)):
             is_host = i % 4 in [0, 1]
             current_character = host if is_host else maya
-            
-            if lang == 'en':
-                AudioGenerator.generate_playht(text, output_file, current_character.voice_url)
-            else:  # 'id'
-                AudioGenerator.generate_gtts(text, output_file, lang='id')
-
-        # Video clip creation
-        clips = []
-        for i, (text, audio_file, dialog_events) in enumerate(zip(processed_texts, audio_files, all_events)):
-            audio_clip = AudioFileClip(audio_file)
-            duration = audio_clip.duration + 0.5
-            speaking_char = 1 if i % 4 in [0, 1] else 2
-        
-            dialog = DialogClip(
-                background, 
-                host.scaled_image, 
-                maya.scaled_image, 
-                text, 
-                speaking_char, 
-                duration, 
-                events=dialog_events
+            audio_jobs.append((text, output_file, lang, current_character))
+        
+        # Worker proses dibuat sebelum thread producer berjalan agar fork tidak
+        # menyalin thread yang sedang aktif
+        render_workers, video_encoder = cls._plan_rendering()
+        render_pool = Pool(
+            processes=render_workers,
+            initializer=cls._init_render_worker,
+            initargs=(
+                background,
+                (host.scaled_rgb, host.scaled_alpha),
+                (maya.scaled_rgb, maya.scaled_alpha),
+                video_encoder
             )
-            video_clip = VideoClip(dialog, duration=duration)
-        
-            final_clip = video_clip.set_audio(audio_clip)
-            clips.append(final_clip)
-    
-        final_video = concatenate_videoclips(clips)
-    
-        final_video.write_videofile(
-            output_path,
-            fps=30,
-            codec='libx264',
-            audio_codec='aac'
         )
+        
+        # Producer: audio dikirim ke antrean sesuai urutan dialog begitu selesai,
+        # sehingga rendering segmen pertama bisa dimulai sebelum semua TTS beres
+        audio_queue = queue.Queue(maxsize=cls.QUEUE_SIZE)
+        
+        def produce_audio():
+            try:
+                with ThreadPoolExecutor(max_workers=cls.TTS_WORKERS) as executor:
+                    futures = [executor.submit(cls._generate_dialog_audio, *job) for job in audio_jobs]
+                    for i, future in enumerate(futures):
+                        future.result()
+                        audio_queue.put((i, audio_files[i]))
+            except Exception as e:
+                # Error diteruskan ke consumer agar proses gagal, bukan menunggu selamanya
+                logger.error(f"Audio generation failed: {e}")
+                audio_queue.put(e)
+            finally:
+                audio_queue.put(None)
+        
+        producer = threading.Thread(target=produce_audio, daemon=True)
+        producer.start()
+
+        # Consumer: tiap dialog yang audionya siap langsung dirender paralel
+        # menjadi segmen video sendiri di worker proses
+        with render_pool:
+            pending_segments = []
+            while True:
+                item = audio_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                
+                i, audio_file = item
+                speaking_char = 1 if i % 4 in [0, 1] else 2
+                pending_segments.append(render_pool.apply_async(
+                    cls._render_segment,
+                    (i, processed_texts[i], audio_file, all_events[i], speaking_char)
+                ))
+            
+            segment_files = [segment.get() for segment in pending_segments]
+        
+        producer.join()
+        cls._concat_segments(segment_files, output_path)
     
         # Cleanup
-        for audio_file in audio_files:
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
+        for temp_file in audio_files + segment_files:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
         
         logger.info("Video creation completed successfully")
 